@@ -5,14 +5,166 @@ Run: python FirewallParser.py logs.csv --top 10 --ip_threshold 0.9 --port_thresh
 """
 
 from __future__ import annotations
-import argparse, csv, sys
-from pathlib import Path
+import argparse, heapq, io, mmap, os, re, socket, struct, sys
+import importlib.util as _iu
 import ipaddress as _ip
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from operator import itemgetter
+from pathlib import Path
+import numpy as np
 import pandas as pd
 
+# ---------- optional fast CSV readers ------------------------------- #
+POLARS_OK = _iu.find_spec("polars") is not None
+if POLARS_OK:
+    import polars as pl
+    # scan_csv(infer_schema=…) and collect_all(engine=…) need polars ≥ 1.25;
+    # older installs fall through to the Arrow / pandas readers
+    POLARS_OK = tuple(map(int, re.findall(r'\d+', pl.__version__)[:2])) >= (1, 25)
+
+ARROW_OK = _iu.find_spec("pyarrow") is not None
+if ARROW_OK:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+
+_FIELDS = ('srcip', 'dstip', 'srcport', 'dstport')
+_STORES = ('_src_ip_counts', '_dst_ip_counts', '_src_ports', '_dst_ports')
+_IP_FIELDS = ('srcip', 'dstip')
+_V6_STORES = ('_src_ip_v6', '_dst_ip_v6')           # IPv6 kept as text, per _IP_FIELDS
+# one anchored pattern per key → each str.extract is a single C-level pass;
+# the greedy ``.*,`` makes a repeated key's last value win, as _row_to_dict did
+# (a stray NUL counts as whitespace, as it did to the original csv reader)
+_KV_RE = {k: re.compile(rf'(?:.*,|^)[\s\x00]*{k}[\s\x00]*=[\s\x00]*"?[\s\x00]*([^",\s\x00]*)')
+          for k in _FIELDS}
+# same grammar, all four keys in one bytes pattern for the mmap'd fallback
+# one pass per batch: "\n" (+ a key at the line start) or ",key=value";
+# groups (key, value) come from whichever branch matched
+_KV_PAIR = (rb'(' + '|'.join(_FIELDS).encode() + rb')[^\S\n]*=[^\S\n]*"?[^\S\n]*([^",\s]*)')
+_KV_BYTES = re.compile(rb'\n[^\S\n]*(?:' + _KV_PAIR + rb')?|,[^\S\n]*' + _KV_PAIR)
+_KV_KEYS = itemgetter(0, 2)
+_KV_VALUE = {1: itemgetter(1), 3: itemgetter(3)}
+# match code: 0-3 key after a comma, 4-7 key starting a line, 8 bare line start
+_KV_CODE = {(b'', b''): 8,
+            **{(k.encode(), b''): 4 + i for i, k in enumerate(_FIELDS)},
+            **{(b'', k.encode()): i for i, k in enumerate(_FIELDS)}}
+_IPV4_RE = r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}'
+_OCTET_W = np.array([1 << 24, 1 << 16, 1 << 8, 1], dtype=np.uint32)
+_MASK24  = np.uint32(0xFFFFFF00)
+_ARROW_BLOCK = 64 << 20                              # bytes per Arrow record batch
+_PAR_BLOCK   = 32 << 20                              # bytes per worker task
+_KV_BATCH    = 1 << 20                               # bytes of key=value lines per regex pass
+_COLLAPSE_EVERY = 32                                 # IP count parts buffered per merge
+
+
+def _pack_ipv4(uniq: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct dotted strings → (uint32 array, valid-IPv4 mask)."""
+    ok = uniq.str.fullmatch(_IPV4_RE).to_numpy(dtype=bool, na_value=False).copy()
+    packed = np.zeros(len(uniq), dtype=np.uint32)
+    idx = np.flatnonzero(ok)
+    if idx.size:
+        octets = uniq.iloc[idx].str.split('.', expand=True).to_numpy(dtype=np.uint32)
+        packed[idx] = octets @ _OCTET_W
+        ok[idx[(octets > 255).any(axis=1)]] = False
+    return packed, ok
+
+
+def _ipv6_counts(vals: list, cnts: np.ndarray) -> tuple[Counter[str], int]:
+    """Non-IPv4 leftovers → (IPv6 counts keyed by compressed text, invalid total)."""
+    v6, bad = Counter(), 0
+    for v, c in zip(vals, cnts.tolist()):
+        try:
+            if not (isinstance(v, str) and ':' in v):
+                raise ValueError(v)
+            v6[_ip.IPv6Address(v).compressed] += c
+        except ValueError:
+            bad += c
+    return v6, bad
+
+
+def _parse_ports(s: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Port strings → (uint16 array, valid-port mask); invalid slots hold 0."""
+    p = pd.to_numeric(s, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    ok = (p >= 0) & (p <= 65535) & (p % 1 == 0)
+    return np.where(ok, p, 0).astype(np.uint16), ok
+
+
+def _line_ranges(buf: bytes | mmap.mmap, start: int = 0, end: int | None = None,
+                 block: int | None = None) -> list[int]:
+    """Boundaries of ~``block``-byte (default _PAR_BLOCK) pieces of buf[start:end],
+    each just after a newline."""
+    end = len(buf) if end is None else end
+    block = block or _PAR_BLOCK
+    bounds = [start]
+    while bounds[-1] < end:
+        nl = buf.find(b'\n', bounds[-1] + block, end)
+        bounds.append(end if nl < 0 else nl + 1)
+    return bounds
+
+
+def available_cpus() -> int:
+    """CPUs this process may use (honours affinity masks, unlike os.cpu_count())."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def _blank_lines(batch: bytes) -> int:
+    """Lines of ``batch.split(b'\\n')`` that are empty or a lone CR."""
+    arr = np.frombuffer(batch, dtype=np.uint8)
+    ends = np.append(np.flatnonzero(arr == 10), len(arr))
+    starts = np.append(0, ends[:-1] + 1)
+    width = ends - starts
+    return int(np.count_nonzero(width == 0) +
+               np.count_nonzero(arr[starts[width == 1]] == 13))
+
+
+def _u32_to_dotted(u: int) -> str:
+    return socket.inet_ntoa(struct.pack('>I', int(u)))
+
+
+def _ip_text(k: int | str) -> str:
+    """Store key → display text (IPv6 keys already are text)."""
+    return k if isinstance(k, str) else _u32_to_dotted(k)
+
+
+def _topn(store: Counter | np.ndarray, n: int) -> list[tuple[int, int]]:
+    """Top ``n`` by count, ties by ascending key (independent of merge order)."""
+    if isinstance(store, np.ndarray):                # dense port table
+        idx = np.argsort(-store.astype(np.int64), kind='stable')[:n]
+        return [(int(i), int(store[i])) for i in idx if store[i]]
+    return heapq.nsmallest(n, store.items(), key=lambda kv: (-kv[1], kv[0]))
+
+
+def _ranked(totals: np.ndarray, k: int) -> np.ndarray:
+    """First ``k`` indices of a stable descending sort (ties by index), via one partition."""
+    neg = -totals.astype(np.int64)
+    if len(neg) > k > 0:
+        # keep every value tied with the k-th, so the stable order below is exact
+        cand = np.flatnonzero(neg <= np.partition(neg, k - 1)[k - 1])
+    else:
+        cand = np.arange(len(neg))
+    return cand[np.argsort(neg[cand], kind='stable')][:max(k, 0)]
+
+
+def _cluster_24(ips: np.ndarray, cnts: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """→ (distinct /24 keys, hits per key, key id of every input IP)."""
+    keys, label = np.unique(ips & _MASK24, return_inverse=True)
+    totals = np.bincount(label, weights=cnts, minlength=len(keys)).astype(np.uint64)
+    return keys, totals, label
+
 
 # ══════════════════  core class  ═══════════════════════════════════════
 class FirewallAnalyzer:
+    # fixed attribute set: no per-instance __dict__, and typos raise instead of leaking
+    __slots__ = ('ip_thresh', 'port_thresh', 'top_n', 'verbose',
+                 '_src_ip_counts', '_dst_ip_counts', '_src_ports', '_dst_ports',
+                 '_src_ip_v6', '_dst_ip_v6',
+                 '_bad_rows', '_bad_ips', '_bad_ports',
+                 '_ip_parts', '_sorted_cache', '_sorted_dirty')
+
     def __init__(self,
                  ip_thresh: float = 0.9,
                  port_thresh: float = 0.9,
@@ -23,102 +175,309 @@ class FirewallAnalyzer:
         self.top_n       = top_n
         self.verbose     = verbose
 
-        self._src_ip_counts = pd.Series(dtype="uint32")
-        self._dst_ip_counts = pd.Series(dtype="uint32")
-        self._src_ports     = pd.Series(dtype="uint32")
-        self._dst_ports     = pd.Series(dtype="uint32")
+        self._src_ip_counts: Counter[int] = Counter()   # keyed by packed uint32
+        self._dst_ip_counts: Counter[int] = Counter()
+        self._src_ports = np.zeros(65536, dtype=np.uint64)   # indexed by port
+        self._dst_ports = np.zeros(65536, dtype=np.uint64)
+        self._src_ip_v6: Counter[str] = Counter()       # rare: no packed form
+        self._dst_ip_v6: Counter[str] = Counter()
         self._bad_rows      = 0
+        self._bad_ips       = 0
+        self._bad_ports     = 0
+        # per-chunk (packed IP → count) Series, folded into the Counters in bulk
+        self._ip_parts: dict[str, list[pd.Series]] = {'_src_ip_counts': [],
+                                                      '_dst_ip_counts': []}
+        self._sorted_cache: dict[str, pd.Series] = {}
+        self._sorted_dirty = True                  # set whenever counts change
 
     # ── csv streaming ─────────────────────────────────────────────────
-    @staticmethod
-    def _row_to_dict(row: list[str]) -> dict[str, str]:
-        rec = {}
-        for field in row:
-            if '=' in field:
-                k, v = field.split('=', 1)
-                rec[k.strip()] = v.strip('" ')
-        return rec
-
-    def consume_csv(self, csv_path: Path, chunksize: int = 100_000) -> None:
+    def consume_csv(self, csv_path: Path, chunksize: int = 100_000,
+                    workers: int = 1) -> None:
         head = pd.read_csv(csv_path, nrows=0)
-        direct = {'srcip', 'dstip', 'srcport', 'dstport'}.issubset(head.columns)
-
-        if direct:
+        direct = set(_FIELDS).issubset(head.columns)
+        # workers > 1 spawns processes: callers on Windows / macOS need a
+        # ``if __name__ == "__main__":`` guard, so the library default is 1
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+
+        # reader priority (see README): process pool for files over one block
+        # unless workers == 1, then polars, then Arrow, then pandas / bytes regex
+        if workers > 1 and csv_path.stat().st_size > _PAR_BLOCK:
+            self._consume_parallel(csv_path, list(head.columns) if direct else None, workers)
+        elif POLARS_OK and (direct or hasattr(pl, 'scan_lines')):   # scan_lines: 1.40+
+            self._consume_polars(csv_path, direct)
+        elif direct and ARROW_OK:
+            self._consume_arrow(csv_path)
+        elif direct:
             it = pd.read_csv(csv_path,
-                             usecols=['srcip', 'dstip', 'srcport', 'dstport'],
+                             usecols=list(_FIELDS),
                              chunksize=chunksize, dtype=str, na_filter=False)
             for chunk in it:
                 self._update_counts(chunk)
         else:
-            with csv_path.open(newline='') as fh:
-                rdr, batch = csv.reader(fh, delimiter=',', quotechar='"'), []
-                for i, row in enumerate(rdr, 1):
-                    rec = self._row_to_dict(row)
-                    if rec:
-                        batch.append(rec)
-                    else:
-                        self._bad_rows += 1
-                    if i % chunksize == 0:
-                        self._update_counts(pd.DataFrame(batch)); batch.clear()
-                if batch:
-                    self._update_counts(pd.DataFrame(batch))
+            with csv_path.open('rb') as fh, \
+                    mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self._count_kv_bytes(mm)
 
         if self.verbose and self._bad_rows:
             print(f"[!] skipped {self._bad_rows} malformed rows", file=sys.stderr)
+        if self.verbose and self._bad_ips:
+            print(f"[!] skipped {self._bad_ips} invalid IP addresses", file=sys.stderr)
+        if self.verbose and self._bad_ports:
+            print(f"[!] skipped {self._bad_ports} invalid ports", file=sys.stderr)
+
+    def _consume_arrow(self, csv_path: Path) -> None:
+        reader = pacsv.open_csv(
+            csv_path,
+            read_options=pacsv.ReadOptions(block_size=_ARROW_BLOCK),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=list(_FIELDS),
+                column_types={c: pa.string() for c in _FIELDS}))
+        for batch in reader:
+            self._count_arrow(batch)
+
+    def _count_arrow(self, batch: pa.RecordBatch | pa.Table) -> None:
+        for col in _FIELDS:
+            # count in Arrow; only the distinct values become Python objects
+            vc = pc.value_counts(batch.column(col))
+            self._merge_distinct(col, vc.field('values').to_pylist(),
+                                 vc.field('counts').to_numpy())
+
+    def _consume_polars(self, csv_path: Path, direct: bool) -> None:
+        if direct:
+            # blank lines come back as all-null rows (pandas / Arrow skip them);
+            # other empty cells → '' so they count as bad IPs, as with na_filter=False
+            lf = (pl.scan_csv(csv_path, infer_schema=False)
+                    .filter(~pl.all_horizontal(pl.all().is_null()))
+                    .select(pl.col(_FIELDS).fill_null('')))
+        else:
+            # whole lines (trailing \r stripped), so a stray NUL splits nothing
+            lf = (pl.scan_lines(csv_path)
+                    .filter(pl.col('line') != '')    # blank lines are not malformed
+                    .select(pl.col('line').str.extract(rx.pattern, 1).alias(k)
+                            for k, rx in _KV_RE.items()))
+        # one streaming group-by per column over a shared scan
+        queries = [lf.select(c).drop_nulls().group_by(c).len() for c in _FIELDS]
+        if not direct:
+            # rows without any key are malformed; a missing key in a matched
+            # row is an invalid value, as with the other readers
+            none = pl.all_horizontal(pl.col(_FIELDS).is_null())
+            queries.append(lf.select(none.sum().alias('rows'),
+                                     *((pl.col(c).is_null() & ~none).sum() for c in _FIELDS)))
+        results = pl.collect_all(queries, engine='streaming')
+        for col, df in zip(_FIELDS, results):
+            self._merge_distinct(col, df[col].to_list(), df['len'].to_numpy())
+        if not direct:
+            bad = results[-1].row(0, named=True)
+            self._bad_rows  += bad['rows']
+            self._bad_ips   += sum(bad[c] for c in _IP_FIELDS)
+            self._bad_ports += sum(bad[c] for c in _FIELDS if c not in _IP_FIELDS)
+
+    def _consume_parallel(self, csv_path: Path, names: list[str] | None,
+                          workers: int) -> None:
+        # newline-aligned byte ranges; each worker maps the file itself
+        with csv_path.open('rb') as fh, \
+                mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            bounds = _line_ranges(mm, mm.find(b'\n') + 1 if names else 0)
+
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            for part in ex.map(_count_range, repeat(str(csv_path)),
+                               bounds[:-1], bounds[1:], repeat(names)):
+                self._absorb(part)
+
+    def _absorb(self, part: tuple) -> None:
+        """Merge one _count_range() result into this analyser."""
+        *stores, bad_rows, bad_ips, bad_ports = part
+        self._sorted_dirty = True
+        for attr, other in zip(_STORES + _V6_STORES, stores):
+            store = getattr(self, attr)
+            if isinstance(store, Counter):
+                store.update(other)
+            else:
+                store += other
+        self._bad_rows  += bad_rows
+        self._bad_ips   += bad_ips
+        self._bad_ports += bad_ports
+
+    def _merge_distinct(self, col: str, keys: list, cnts: np.ndarray) -> None:
+        """Fold pre-aggregated (distinct value, count) pairs into a store."""
+        self._sorted_dirty = True
+        attr = _STORES[_FIELDS.index(col)]
+        if col in _IP_FIELDS:
+            packed, ok = _pack_ipv4(pd.Series(keys, dtype=object))
+            if not ok.all():
+                rest = np.flatnonzero(~ok)
+                v6, bad = _ipv6_counts([keys[i] for i in rest], cnts[rest])
+                getattr(self, _V6_STORES[_IP_FIELDS.index(col)]).update(v6)
+                self._bad_ips += bad
+            # distinct spellings (e.g. "010.…") may pack to one address;
+            # the collapse groupby folds them
+            self._add_ip_part(attr, packed[ok], cnts[ok])
+        else:
+            store = getattr(self, attr)
+            ports, ok = _parse_ports(pd.Series(keys, dtype=object))
+            self._bad_ports += int(cnts[~ok].sum())
+            store += np.bincount(ports[ok], weights=cnts[ok],
+                                 minlength=65536).astype(np.uint64)
+
+    def _count_kv_bytes(self, buf: bytes | mmap.mmap, lo: int = 0, hi: int | None = None) -> None:
+        """key=value fallback: one C regex pass per _KV_BATCH slice of buf[lo:hi].
+
+        Every line start is itself a match, so the per-line bookkeeping is
+        NumPy work on the match codes; only the (key, value) match counts
+        carry over, and each distinct value is decoded once at the end.
+        """
+        counts, hit = [Counter() for _ in _FIELDS], 0
+        bounds = _line_ranges(buf, lo, hi, _KV_BATCH)
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            # a stray NUL is just whitespace, as it was to the original csv reader
+            batch = buf[a:b].replace(b'\0', b' ')
+            found = _KV_BYTES.findall(b'\n' + batch)
+            code = np.fromiter(map(_KV_CODE.__getitem__, map(_KV_KEYS, found)),
+                               dtype=np.int8, count=len(found))
+            line = np.cumsum(code >= 4)              # line number of each match
+            has = np.flatnonzero(code != 8)          # matches carrying a key
+            keyed = int(np.count_nonzero(np.diff(line[has]))) + 1 if has.size else 0
+            # lines with none of the four keys, not counting blank ones
+            self._bad_rows += int(line[-1]) - keyed - _blank_lines(batch)
+            hit += keyed
+            # a repeated key keeps its last value, as in the original csv reader
+            kid = code[has] & 3
+            for k, store in enumerate(counts):
+                idx = has[kid == k]
+                ln = line[idx]
+                last = idx[np.append(ln[1:] != ln[:-1], True)] if idx.size else idx
+                at_start = code[last] >= 4               # value in group 1, else 3
+                for group, sel in ((1, last[at_start]), (3, last[~at_start])):
+                    store.update(map(_KV_VALUE[group], map(found.__getitem__, sel.tolist())))
+        for col, store in zip(_FIELDS, counts):
+            keys = [v.decode('latin-1') for v in store]
+            cnts = list(store.values())
+            # a matched line missing this key counts as invalid, as NaN did before
+            missing = hit - sum(cnts)
+            if col in _IP_FIELDS:
+                self._bad_ips += missing
+            else:
+                self._bad_ports += missing
+            self._merge_distinct(col, keys, np.asarray(cnts, dtype=np.int64))
 
     def _update_counts(self, df: pd.DataFrame) -> None:
-        for col, store in [('srcip', '_src_ip_counts'),
-                           ('dstip', '_dst_ip_counts'),
-                           ('srcport', '_src_ports'),
-                           ('dstport', '_dst_ports')]:
-            if col in df.columns:
-                setattr(self, store,
-                        getattr(self, store).add(df[col].astype(str).value_counts(),
-                                                 fill_value=0))
+        self._sorted_dirty = True
+        for col, attr in zip(_FIELDS, _STORES):
+            if col not in df.columns:
+                continue
+            # readers use dtype=str (+ na_filter=False), so no astype(str) copy
+            vals = df[col]
+            assert pd.api.types.is_string_dtype(vals.dtype), f"{col}: {vals.dtype}"
+            if col in _IP_FIELDS:
+                # one C hash pass; each distinct value is then parsed once
+                codes, uniq = pd.factorize(vals)
+                self._bad_ips += int((codes < 0).sum())
+                self._merge_distinct(col, uniq, np.bincount(codes[codes >= 0],
+                                                            minlength=len(uniq)))
+            else:
+                store = getattr(self, attr)
+                ports, ok = _parse_ports(vals)
+                self._bad_ports += int((~ok).sum())
+                # one O(N) pass, no hashing
+                store += np.bincount(ports[ok], minlength=65536).astype(np.uint64)
+
+    def _add_ip_part(self, attr: str, ips: np.ndarray, cnts: np.ndarray) -> None:
+        parts = self._ip_parts[attr]
+        parts.append(pd.Series(cnts.astype(np.int64), index=ips))
+        if len(parts) >= _COLLAPSE_EVERY:
+            self._collapse_ip_parts(attr)
+
+    def _collapse_ip_parts(self, attr: str | None = None) -> None:
+        """One C-level groupby over the buffered parts, then one Counter merge."""
+        for a in ([attr] if attr else list(self._ip_parts)):
+            parts = self._ip_parts[a]
+            if parts:
+                merged = pd.concat(parts).groupby(level=0).sum()
+                getattr(self, a).update(dict(zip(merged.index.tolist(), merged.tolist())))
+                parts.clear()
+
+    def _as_series(self, store: str) -> pd.Series:
+        if self._sorted_dirty:
+            self._collapse_ip_parts()
+            self._sorted_cache.clear()
+            self._sorted_dirty = False
+        if store not in self._sorted_cache:
+            data = getattr(self, store)
+            if isinstance(data, np.ndarray):
+                nz = np.flatnonzero(data)
+                data = pd.Series(data[nz], index=nz)
+            # count desc, then key asc: Counter order depends on chunking / workers
+            self._sorted_cache[store] = (pd.Series(data, dtype="uint32").sort_index()
+                                         .sort_values(ascending=False, kind='stable'))
+        return self._sorted_cache[store]
+
+    # memoised between rule_suggestions() calls (e.g. GUI threshold tweaks)
+    @property
+    def sorted_src_ip_counts(self) -> pd.Series:
+        return self._as_series('_src_ip_counts')
+
+    @property
+    def sorted_dst_ip_counts(self) -> pd.Series:
+        return self._as_series('_dst_ip_counts')
+
+    @property
+    def sorted_dst_ports(self) -> pd.Series:
+        return self._as_series('_dst_ports')
 
     # ── quick table for GUI / CLI display ────────────────────────────
-    def top_table(self) -> dict[str, pd.Series]:
+    def top_table(self) -> dict[str, list[tuple[str | int, int]]]:
+        def top(store: str) -> list[tuple[str | int, int]]:
+            items = _topn(getattr(self, store), self.top_n)
+            if store.endswith('_ip_counts'):
+                items = [(_u32_to_dotted(k), c) for k, c in items]
+                v6 = getattr(self, _V6_STORES[_STORES.index(store)])
+                if v6:                               # IPv4 first on equal counts
+                    items = sorted(items + _topn(v6, self.top_n),
+                                   key=lambda kc: -kc[1])[:self.top_n]
+            return items
+        self._collapse_ip_parts()
         return {
-            "Source IP":        self._src_ip_counts.nlargest(self.top_n),
-            "Destination IP":   self._dst_ip_counts.nlargest(self.top_n),
-            "Source Port":      self._src_ports.nlargest(self.top_n),
-            "Destination Port": self._dst_ports.nlargest(self.top_n),
+            "Source IP":        top('_src_ip_counts'),
+            "Destination IP":   top('_dst_ip_counts'),
+            "Source Port":      top('_src_ports'),
+            "Destination Port": top('_dst_ports'),
         }
 
     # ── helper utilities ─────────────────────────────────────────────
     @staticmethod
-    def _supernet(ip_list: list[str]) -> str | None:
-        try:
-            nets = [_ip.ip_network(ip) if '/' in ip else _ip.ip_network(ip + '/32')
-                    for ip in ip_list]
-            collapsed = list(_ip.collapse_addresses(nets))
-            if len(collapsed) == 1:
-                return str(collapsed[0])
-            sup = collapsed[0]
-            for net in collapsed[1:]:
-                while not net.subnet_of(sup):
-                    sup = sup.supernet(new_prefix=sup.prefixlen - 1)
-            return str(sup)
-        except ValueError:
-            return None
+    def _supernet_u32(arr: np.ndarray) -> tuple[int, int]:
+        lo, hi = int(arr.min()), int(arr.max())
+        prefix = 32 - (lo ^ hi).bit_length()          # common leading bits
+        mask = (0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF
+        return lo & mask, prefix
 
-    def _threshold_subset(self, s: pd.Series, t: float) -> tuple[list[str], float]:
+    def _threshold_subset(self, s: pd.Series, t: float) -> tuple[np.ndarray, float]:
         if s.empty:
-            return [], 0.0
-        total, cum, elems = s.sum(), 0, []
-        for v, c in s.items():
-            cum += c; elems.append(v)
-            if cum / total >= t:
-                break
-        return elems, cum / total
+            return s.index.to_numpy(), 0.0
+        if not s.is_monotonic_decreasing:            # callers normally pass sorted input
+            s = s.sort_values(ascending=False)
+        cum = s.to_numpy().cumsum()
+        frac = cum / cum[-1]                         # same rounding as ``cum / total >= t``
+        k = min(int(np.searchsorted(frac, t)) + 1, len(cum))
+        return s.index.to_numpy()[:k], frac[k - 1]
+
+    def _with_ipv6(self, store: str, v6_store: str) -> pd.Series:
+        """Rank IPv6 text keys alongside the packed IPv4 ones (object index)."""
+        s = self._as_series(store)                   # drops stale cache entries first
+        if v6_store not in self._sorted_cache:
+            v6 = pd.Series(getattr(self, v6_store), dtype="uint32").sort_index()
+            self._sorted_cache[v6_store] = pd.concat([s, v6]).sort_values(
+                ascending=False, kind='stable')
+        return self._sorted_cache[v6_store]
 
     def _best_network(self, s: pd.Series, thresh: float, max_pref: int) -> tuple[str | None, float]:
         ips, cov = self._threshold_subset(s, thresh)
-        net = self._supernet(ips) if ips else None
-        return (net, cov) if net and _ip.ip_network(net).prefixlen >= max_pref else (None, cov)
-
-    def _ip_to24(self, ip: str) -> str:
-        o = ip.split('.'); return '.'.join(o[:3] + ['0']) + '/24'
+        # IPv6 never forms a supernet here; such sets fall back to a listing
+        if not len(ips) or (ips.dtype == object and any(isinstance(k, str) for k in ips)):
+            return None, cov
+        base, prefix = self._supernet_u32(ips.astype(np.uint32))
+        return (f"{_u32_to_dotted(base)}/{prefix}", cov) if prefix >= max_pref else (None, cov)
 
     # ── rule generator (condensed) ───────────────────────────────────
     def rule_suggestions(self,
@@ -128,36 +487,45 @@ class FirewallAnalyzer:
                          target_coverage: float = 0.80) -> list[str]:
 
         suggestions: list[str] = []
+        src_ips, dst_ips = self.sorted_src_ip_counts, self.sorted_dst_ip_counts
+        port_series = self.sorted_dst_ports
+        if self._src_ip_v6:
+            src_ips = self._with_ipv6('_src_ip_counts', '_src_ip_v6')
 
         # ---- source network (up to /21) ------------------------------
-        src_net, src_cov = self._best_network(self._src_ip_counts, self.ip_thresh, 21)
+        src_net, src_cov = self._best_network(src_ips, self.ip_thresh, 21)
         if not src_net:
-            tops, src_cov = self._threshold_subset(self._src_ip_counts, self.ip_thresh)
-            src_net = ', '.join(tops[:3]) + ('…' if len(tops) > 3 else '')
+            tops, src_cov = self._threshold_subset(src_ips, self.ip_thresh)
+            src_net = ', '.join(map(_ip_text, tops[:3])) + ('…' if len(tops) > 3 else '')
 
         # ---- dominant destination ports ------------------------------
-        port_series = self._dst_ports.sort_values(ascending=False)
-        ports = [p for p, c in port_series.items()
-                 if c / port_series.sum() >= min_port_share][:max_ports]
+        total_p = port_series.sum()
+        ports = port_series[port_series >= min_port_share * total_p].index[:max_ports].tolist()
         if not ports:
             return ["No destination port exceeds the minimum share threshold."]
-        port_list_str = ", ".join(ports)
+        port_list_str = ", ".join(map(str, ports))
 
         # ---- /24 destination clustering ------------------------------
-        cluster_bytes, per_cluster = {}, {}
-        for ip, cnt in self._dst_ip_counts.items():
-            cidr = self._ip_to24(ip)
-            cluster_bytes[cidr] = cluster_bytes.get(cidr, 0) + cnt
-            per_cluster.setdefault(cidr, pd.Series(dtype="uint32"))[ip] = cnt
-
-        clusters_sorted = sorted(cluster_bytes.items(),
-                                 key=lambda kv: kv[1], reverse=True)
-
-        total_dst, covered, seen = self._dst_ip_counts.sum(), 0, set()
+        _, totals, label = _cluster_24(dst_ips.index.to_numpy(dtype=np.uint32),
+                                       dst_ips.to_numpy(dtype=np.uint64))
+        # stable sort keeps each cluster's members in descending-count order
+        order = np.argsort(label, kind='stable')
+        sizes = np.bincount(label, minlength=len(totals))
+        ends = sizes.cumsum()
+        starts = ends - sizes
+        # each /24 yields its own rule (a supernet inside it is ≥ /24, within the
+        # /20 limit), so the loop never needs more than max_rules clusters
+        clusters_sorted = _ranked(totals, max_rules).tolist()
+
+        # IPv6 destinations get no /24 cluster but still count towards coverage
+        total_dst = dst_ips.sum() + sum(self._dst_ip_v6.values())
+        covered, seen = 0, set()
 
         # ---- emit concise rules (dst nets up to /20) -----------------
-        for cidr, bytes_in in clusters_sorted:
-            dst_net, dst_cov = self._best_network(per_cluster[cidr],
+        for cid in clusters_sorted:
+            bytes_in = totals[cid]
+            members = dst_ips.iloc[order[starts[cid]:ends[cid]]]
+            dst_net, dst_cov = self._best_network(members,
                                                   self.ip_thresh, 20)  # /20 supernet allowed
             if not dst_net or dst_net in seen:
                 continue
@@ -173,7 +541,7 @@ class FirewallAnalyzer:
                 break
 
         # ---- anomaly hint -------------------------------------------
-        rare = self._dst_ports[self._dst_ports < 5]
+        rare = port_series[port_series < 5].sort_index()
         if not rare.empty:
             suggestions.append("Rare destination ports (<5 hits): " +
                                ', '.join(map(str, rare.index[:10])) + ' …')
@@ -181,6 +549,27 @@ class FirewallAnalyzer:
         return suggestions or ["No patterns met the thresholds."]
 
 
+def _count_range(path: str, lo: int, hi: int, names: list[str] | None) -> tuple:
+    """Worker: count bytes [lo, hi) of ``path`` (``names`` → columnar CSV)."""
+    fa = FirewallAnalyzer()
+    with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if names and ARROW_OK:
+            fa._count_arrow(pacsv.read_csv(
+                pa.BufferReader(mm[lo:hi]),
+                read_options=pacsv.ReadOptions(column_names=names),
+                convert_options=pacsv.ConvertOptions(
+                    include_columns=list(_FIELDS),
+                    column_types={c: pa.string() for c in _FIELDS})))
+        elif names:
+            fa._update_counts(pd.read_csv(io.BytesIO(mm[lo:hi]), header=None, names=names,
+                                          usecols=list(_FIELDS), dtype=str, na_filter=False))
+        else:
+            fa._count_kv_bytes(mm, lo, hi)           # sliced in batches, no block copy
+    fa._collapse_ip_parts()
+    return (*(getattr(fa, a) for a in _STORES + _V6_STORES),
+            fa._bad_rows, fa._bad_ips, fa._bad_ports)
+
+
 # ══════════════════  CLI wrapper  ═══════════════════════════════════════
 def _run_cli() -> None:
     ap = argparse.ArgumentParser(description="Firewall log analyser → rule suggestions")
@@ -188,18 +577,23 @@ def _run_cli() -> None:
     ap.add_argument("--top", type=int, default=10, help="Top-N rows to show")
     ap.add_argument("--ip_threshold", type=float, default=0.9)
     ap.add_argument("--port_threshold", type=float, default=0.9)
+    ap.add_argument("-j", "--workers", type=int, default=None,
+                    help="Parser processes for files over 32 MiB "
+                         "(default: all available CPUs; 1 = single-process reader)")
     ap.add_argument("-v", "--verbose", action="store_true")
     args = ap.parse_args()
+    if args.workers is not None and args.workers < 1:
+        ap.error("--workers must be at least 1")
 
     fa = FirewallAnalyzer(ip_thresh=args.ip_threshold,
                           port_thresh=args.port_threshold,
                           top_n=args.top,
                           verbose=args.verbose)
-    fa.consume_csv(Path(args.csv_file))
+    fa.consume_csv(Path(args.csv_file), workers=args.workers or available_cpus())
 
     print("==== Top values ====")
-    for cat, ser in fa.top_table().items():
-        print(f"\n{cat}:\n{ser.to_string()}")
+    for cat, items in fa.top_table().items():
+        print(f"\n{cat}:\n" + '\n'.join(f"{k:<15}  {v}" for k, v in items))
 
     print("\n==== Firewall rule suggestion(s) ====")
     for line in fa.rule_suggestions():
@@ -1,13 +1,16 @@
 #!/usr/bin/env python3
 # firewall_gui_tk.py  –  Tkinter front-end for FirewallParser
 
+from __future__ import annotations
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
 import datetime as _dt
 import importlib.util as _iu
+import multiprocessing as _mp
+import queue, threading
 
-from FirewallParser import FirewallAnalyzer
+from FirewallParser import FirewallAnalyzer, available_cpus
 
 # ---------- optional PDF support ------------------------------------ #
 PDF_OK = _iu.find_spec("reportlab") is not None
@@ -30,43 +33,66 @@ def analyze() -> None:
         messagebox.showerror("Error", "Please select a valid CSV file.")
         return
 
-    global last_report
+    # read widget values here – Tk must only be touched from the main thread
     fa = FirewallAnalyzer(
         ip_thresh=ip_scale.get(),
         port_thresh=port_scale.get(),
         top_n=int(top_spin.get())
     )
-    try:
-        fa.consume_csv(file_path)
-    except Exception as e:
-        messagebox.showerror("Parse error", str(e))
-        return
-
-    # Build report text
-    lines = [f"Analysis run: {_dt.datetime.now():%Y-%m-%d %H:%M:%S}",
-             f"Log file: {file_path}",
-             ""]
-
-    for cat, series in fa.top_table().items():
-        lines.append(f"Top {fa.top_n} {cat}:")
-        lines.append(series.to_string())
-        lines.append("")
-
-    lines.append("Firewall rule suggestion(s):")
-    lines.extend(fa.rule_suggestions())
-    last_report = "\n".join(lines)
-
-    # Display
+    report_parts.clear()
     output_box.config(state="normal")
     output_box.delete("1.0", tk.END)
-    output_box.insert(tk.END, last_report)
     output_box.config(state="disabled")
+    analyze_btn.config(state="disabled")
+    export_btn.config(state="disabled")
 
-    export_btn.config(state="normal")   # enable export now that we have data
+    threading.Thread(target=_worker, args=(fa, file_path), daemon=True).start()
+    root.after(50, _poll)
+
+def _worker(fa: FirewallAnalyzer, file_path: Path) -> None:
+    # always post a terminal event, or _poll keeps Analyze disabled for good
+    result = ("error", "Analysis aborted.")
+    try:
+        fa.consume_csv(file_path, workers=available_cpus())
+        events.put(("section", f"Analysis run: {_dt.datetime.now():%Y-%m-%d %H:%M:%S}\n"
+                               f"Log file: {file_path}\n\n"))
+        for cat, items in fa.top_table().items():
+            events.put(("section", f"Top {fa.top_n} {cat}:\n" +
+                        "".join(f"{k:<15}  {v}\n" for k, v in items) + "\n"))
+        events.put(("section", "Firewall rule suggestion(s):\n" +
+                    "\n".join(fa.rule_suggestions())))
+        result = ("done", None)
+    except Exception as e:          # e.g. MemoryError, whose str() is empty
+        result = ("error", str(e) or type(e).__name__)
+    finally:
+        events.put(result)
+
+def _poll() -> None:
+    """Drain worker events into the text box; re-arm until the run finishes."""
+    try:
+        while True:
+            kind, payload = events.get_nowait()
+            if kind == "section":
+                report_parts.append(payload)
+                output_box.config(state="normal")
+                output_box.insert(tk.END, payload)
+                output_box.config(state="disabled")
+            elif kind == "error":
+                analyze_btn.config(state="normal")
+                messagebox.showerror("Parse error", payload)
+                return
+            else:  # done
+                analyze_btn.config(state="normal")
+                export_btn.config(state="normal")   # enable export now that we have data
+                return
+    except queue.Empty:
+        pass
+    root.after(50, _poll)
 
 def export_report() -> None:
-    if not last_report:
+    if not report_parts:
         return
+    last_report = "".join(report_parts)
     ftypes = [("Text file", "*.txt")]
     if PDF_OK:
         ftypes.append(("PDF", "*.pdf"))
@@ -96,50 +122,54 @@ def _save_pdf(dest: str, text: str) -> None:
     c.save()
 
 # ---------- UI ------------------------------------------------------- #
-root = tk.Tk()
-root.title("Firewall Log Analyzer")
-
-main = ttk.Frame(root, padding=10)
-main.grid(sticky="nsew")
-root.columnconfigure(0, weight=1)
-root.rowconfigure(0, weight=1)
-
-# File chooser
-csv_var = tk.StringVar()
-ttk.Label(main, text="Firewall CSV:").grid(row=0, column=0, sticky="w")
-ttk.Entry(main, textvariable=csv_var, width=60).grid(row=0, column=1, sticky="ew")
-ttk.Button(main, text="Browse…", command=pick_file).grid(row=0, column=2, padx=5)
-main.columnconfigure(1, weight=1)
-
-# Parameters
-param = ttk.LabelFrame(main, text="Parameters", padding=10)
-param.grid(row=1, column=0, columnspan=3, pady=10, sticky="ew")
-
-ttk.Label(param, text="Top N:").grid(row=0, column=0, sticky="w")
-top_spin = ttk.Spinbox(param, from_=1, to=50, width=5)
-top_spin.set(10)
-top_spin.grid(row=0, column=1, sticky="w", padx=(0, 15))
-
-ttk.Label(param, text="IP coverage threshold").grid(row=0, column=2, sticky="w")
-ip_scale = ttk.Scale(param, from_=0.5, to=1.0, value=0.9)
-ip_scale.grid(row=0, column=3, sticky="ew", padx=(0, 15))
-
-ttk.Label(param, text="Port coverage threshold").grid(row=0, column=4, sticky="w")
-port_scale = ttk.Scale(param, from_=0.5, to=1.0, value=0.9)
-port_scale.grid(row=0, column=5, sticky="ew")
-param.columnconfigure(3, weight=1)
-param.columnconfigure(5, weight=1)
-
-# Action buttons
-ttk.Button(main, text="Analyze", command=analyze).grid(row=2, column=2, sticky="e")
-export_btn = ttk.Button(main, text="Export…", command=export_report, state="disabled")
-export_btn.grid(row=2, column=1, sticky="e", padx=5)
-
-# Output box
-output_box = tk.Text(main, width=100, height=30, wrap="word", font=("Consolas", 10))
-output_box.grid(row=3, column=0, columnspan=3, pady=(10, 0), sticky="nsew")
-output_box.config(state="disabled")
-main.rowconfigure(3, weight=1)
-
-last_report = ""   # populated after first analysis
-root.mainloop()
+if __name__ == "__main__":          # guard: worker processes re-import this module
+    _mp.freeze_support()            # PyInstaller one-file builds
+    root = tk.Tk()
+    root.title("Firewall Log Analyzer")
+
+    main = ttk.Frame(root, padding=10)
+    main.grid(sticky="nsew")
+    root.columnconfigure(0, weight=1)
+    root.rowconfigure(0, weight=1)
+
+    # File chooser
+    csv_var = tk.StringVar()
+    ttk.Label(main, text="Firewall CSV:").grid(row=0, column=0, sticky="w")
+    ttk.Entry(main, textvariable=csv_var, width=60).grid(row=0, column=1, sticky="ew")
+    ttk.Button(main, text="Browse…", command=pick_file).grid(row=0, column=2, padx=5)
+    main.columnconfigure(1, weight=1)
+
+    # Parameters
+    param = ttk.LabelFrame(main, text="Parameters", padding=10)
+    param.grid(row=1, column=0, columnspan=3, pady=10, sticky="ew")
+
+    ttk.Label(param, text="Top N:").grid(row=0, column=0, sticky="w")
+    top_spin = ttk.Spinbox(param, from_=1, to=50, width=5)
+    top_spin.set(10)
+    top_spin.grid(row=0, column=1, sticky="w", padx=(0, 15))
+
+    ttk.Label(param, text="IP coverage threshold").grid(row=0, column=2, sticky="w")
+    ip_scale = ttk.Scale(param, from_=0.5, to=1.0, value=0.9)
+    ip_scale.grid(row=0, column=3, sticky="ew", padx=(0, 15))
+
+    ttk.Label(param, text="Port coverage threshold").grid(row=0, column=4, sticky="w")
+    port_scale = ttk.Scale(param, from_=0.5, to=1.0, value=0.9)
+    port_scale.grid(row=0, column=5, sticky="ew")
+    param.columnconfigure(3, weight=1)
+    param.columnconfigure(5, weight=1)
+
+    # Action buttons
+    analyze_btn = ttk.Button(main, text="Analyze", command=analyze)
+    analyze_btn.grid(row=2, column=2, sticky="e")
+    export_btn = ttk.Button(main, text="Export…", command=export_report, state="disabled")
+    export_btn.grid(row=2, column=1, sticky="e", padx=5)
+
+    # Output box
+    output_box = tk.Text(main, width=100, height=30, wrap="word", font=("Consolas", 10))
+    output_box.grid(row=3, column=0, columnspan=3, pady=(10, 0), sticky="nsew")
+    output_box.config(state="disabled")
+    main.rowconfigure(3, weight=1)
+
+    events: queue.Queue = queue.Queue()   # worker → UI messages
+    report_parts: list[str] = []          # populated by each analysis run
+    root.mainloop()
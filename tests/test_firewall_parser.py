@@ -0,0 +1,160 @@
+"""Every reader back-end must produce the same counts, rules and error tallies."""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import FirewallParser as FP
+from FirewallParser import FirewallAnalyzer
+
+COLUMNAR = (
+    "date,srcip,dstip,srcport,dstport,action\r\n"
+    "d,10.0.0.1,192.168.1.10,5000,443,accept\r\n"
+    "d,10.0.0.2,192.168.1.11,5001,443,accept\r\n"
+    "\r\n"
+    "d,10.0.0.1,192.168.1.10,5002,53,accept\r\n"
+    "d,10.0.0.3,192.168.2.20,5000,99999,drop\r\n"      # bad port
+    "d,2001:db8::1,192.168.2.21,x,443,accept\r\n"      # IPv6 source, bad port
+    "d,999.1.1.1,,5003,22,drop\r\n"                    # bad + empty IP
+    "d,10.0.0.2,10.9.9.9,5004,443,accept\r\n"
+)
+
+KV = (
+    'srcip="10.0.0.1",dstip="192.168.1.10",srcport="5000",dstport="443"\n'
+    "srcip=10.0.0.2, dstip = 192.168.1.11,srcport=5001,dstport=443\r\n"
+    "\n"
+    "\r\n"
+    "garbage line\n"
+    "srcip=10.0.0.1,dstip=192.168.1.10,srcport=5002,dstport=53\n"
+    "srcip=10.0.0.3,dstip=192.168.2.20,srcport=5000,dstport=99999\n"    # bad port
+    "srcip=10.0.0.4\x00,dstip=192.168.2.20,dstport=80\n"                # NUL is whitespace
+    "srcip=2001:db8::1,dstip=192.168.2.21,dstport=443\n"                 # missing srcport
+    "srcip=10.0.0.2,dstip=10.9.9.9,srcport=5004,dstport=1,dstport=443\n"
+    "srcip=10.0.0.5,srcip=10.0.0.1,dstip=10.9.9.9,dstport=443\n"        # missing srcport
+)
+
+
+def _needs(polars: bool = False, arrow: bool = False) -> list:
+    marks = []
+    if polars and not FP.POLARS_OK:
+        marks.append(pytest.mark.skip(reason="polars not installed"))
+    if arrow and not FP.ARROW_OK:
+        marks.append(pytest.mark.skip(reason="pyarrow not installed"))
+    return marks
+
+
+# (POLARS_OK, ARROW_OK, workers)
+BACKENDS = [
+    pytest.param((True, False, 1), id="polars", marks=_needs(polars=True)),
+    pytest.param((False, True, 1), id="arrow", marks=_needs(arrow=True)),
+    pytest.param((False, False, 1), id="pandas"),
+    pytest.param((False, True, 3), id="parallel-arrow", marks=_needs(arrow=True)),
+    pytest.param((False, False, 3), id="parallel-pandas"),
+]
+
+
+def _write(directory: Path, text: str) -> Path:
+    directory.mkdir(exist_ok=True)
+    path = directory / "log.csv"
+    path.write_bytes(text.encode())
+    return path
+
+
+def _analyse(path: Path, workers: int = 1) -> tuple:
+    fa = FirewallAnalyzer(top_n=50, ip_thresh=0.6)
+    fa.consume_csv(path, workers=workers)
+    return (fa.top_table(), fa.rule_suggestions(),
+            fa._bad_rows, fa._bad_ips, fa._bad_ports)
+
+
+def _reference(tmp_path: Path, text: str) -> tuple:
+    """Single-process pandas / bytes-regex result with default block sizes."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(FP, "POLARS_OK", False)
+        mp.setattr(FP, "ARROW_OK", False)
+        mp.setattr(FP, "_PAR_BLOCK", 32 << 20)
+        mp.setattr(FP, "_KV_BATCH", 1 << 20)
+        return _analyse(_write(tmp_path / "ref", text))
+
+
+@pytest.fixture
+def backend(request, monkeypatch) -> int:
+    polars, arrow, workers = request.param
+    monkeypatch.setattr(FP, "POLARS_OK", polars)
+    monkeypatch.setattr(FP, "ARROW_OK", arrow)
+    # tiny blocks so the logs split into several ranges / regex batches;
+    # threads see the patched flags, spawned worker processes would not
+    monkeypatch.setattr(FP, "_PAR_BLOCK", 64)
+    monkeypatch.setattr(FP, "_KV_BATCH", 48)
+    monkeypatch.setattr(FP, "ProcessPoolExecutor", ThreadPoolExecutor)
+    return workers
+
+
+def test_columnar_reference(tmp_path):
+    top, _, bad_rows, bad_ips, bad_ports = _reference(tmp_path, COLUMNAR)
+    assert top["Source IP"] == [("10.0.0.1", 2), ("10.0.0.2", 2),
+                                ("10.0.0.3", 1), ("2001:db8::1", 1)]
+    assert top["Source Port"][:2] == [(5000, 2), (5001, 1)]
+    assert top["Destination Port"] == [(443, 4), (22, 1), (53, 1)]
+    assert (bad_rows, bad_ips, bad_ports) == (0, 2, 2)
+
+
+def test_kv_reference(tmp_path):
+    top, _, bad_rows, bad_ips, bad_ports = _reference(tmp_path, KV)
+    assert top["Source IP"] == [("10.0.0.1", 3), ("10.0.0.2", 2), ("10.0.0.3", 1),
+                                ("10.0.0.4", 1), ("2001:db8::1", 1)]
+    assert top["Destination IP"][:3] == [("10.9.9.9", 2), ("192.168.1.10", 2),
+                                         ("192.168.2.20", 2)]
+    # a repeated key keeps its last value; the NUL line keeps its dstip and dstport
+    assert top["Destination Port"] == [(443, 5), (53, 1), (80, 1)]
+    assert (bad_rows, bad_ips, bad_ports) == (1, 0, 4)
+
+
+@pytest.mark.parametrize("backend", BACKENDS, indirect=True)
+@pytest.mark.parametrize("text", [COLUMNAR, KV], ids=["columnar", "kv"])
+def test_backends_agree(tmp_path, backend, text):
+    expected = _reference(tmp_path, text)
+    assert _analyse(_write(tmp_path / "run", text), workers=backend) == expected
+
+
+def test_process_pool_matches_serial(tmp_path, monkeypatch):
+    text = KV * 20
+    expected = _reference(tmp_path, text)
+    monkeypatch.setattr(FP, "POLARS_OK", False)
+    monkeypatch.setattr(FP, "_PAR_BLOCK", 256)
+    assert _analyse(_write(tmp_path / "run", text), workers=2) == expected
+
+
+def test_ipv6_sources_are_listed():
+    fa = FirewallAnalyzer()
+    fa._merge_distinct("srcip", ["2001:db8::1", "2001:db8::2"], np.array([2, 1]))
+    fa._merge_distinct("dstip", ["10.0.0.1"], np.array([3]))
+    fa._merge_distinct("dstport", ["80"], np.array([3]))
+    assert fa.rule_suggestions()[0].startswith("Allow 2001:db8::1, 2001:db8::2 ➜ 10.0.0.1/32")
+    # the merged IPv4 + IPv6 ranking is memoised like the other sorted views
+    merged = fa._with_ipv6("_src_ip_counts", "_src_ip_v6")
+    assert fa._with_ipv6("_src_ip_counts", "_src_ip_v6") is merged
+    fa._merge_distinct("srcip", ["2001:db8::3"], np.array([5]))
+    assert fa._with_ipv6("_src_ip_counts", "_src_ip_v6").index[0] == "2001:db8::3"
+
+
+def test_ranked_matches_stable_sort():
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        totals = rng.integers(0, 5, rng.integers(1, 60)).astype(np.uint64)   # many ties
+        k = int(rng.integers(1, 20))
+        full = np.argsort(-totals.astype(np.int64), kind="stable")
+        assert FP._ranked(totals, k).tolist() == full[:k].tolist()
+
+
+def test_threshold_subset_exact_boundary():
+    ips, cov = FirewallAnalyzer()._threshold_subset(pd.Series([14, 11], dtype="uint32"), 0.56)
+    assert len(ips) == 1 and cov == 14 / 25
+
+
+def test_workers_must_be_positive(tmp_path):
+    with pytest.raises(ValueError):
+        FirewallAnalyzer().consume_csv(_write(tmp_path, KV), workers=0)